@@ -1,19 +1,18 @@
 import six
 
 from django import forms
-from django.core.urlresolvers import reverse
 from rest_framework import serializers
 from rest_framework.response import Response
 
-from sentry.exceptions import InvalidIdentity, PluginError, PluginIdentityRequired
+from sentry.exceptions import InvalidIdentity, PluginError
 from sentry.plugins.base import plugins
 from sentry.api.bases.project import ProjectEndpoint
 from sentry.api.exceptions import ResourceDoesNotExist
 from sentry.api.serializers import serialize
 from sentry.api.serializers.models.plugin import (
-    PluginSerializer,
     PluginWithConfigSerializer,
     serialize_field,
+    serialize_plugin_for_project,
 )
 from sentry.models import AuditLogEntryEvent
 from sentry.signals import plugin_enabled
@@ -34,12 +33,7 @@ class ProjectPluginDetailsEndpoint(ProjectEndpoint):
     def get(self, request, project, plugin_id):
         plugin = self._get_plugin(plugin_id)
 
-        try:
-            context = serialize(plugin, request.user, PluginWithConfigSerializer(project))
-        except PluginIdentityRequired as e:
-            context = serialize(plugin, request.user, PluginSerializer(project))
-            context["config_error"] = six.text_type(e)
-            context["auth_url"] = reverse("socialauth_associate", args=[plugin.slug])
+        context = serialize_plugin_for_project(plugin, project, request.user)
 
         return Response(context)
 
@@ -1,3 +1,4 @@
+import functools
 import re
 from collections import namedtuple, defaultdict
 from copy import deepcopy
@@ -2103,6 +2104,31 @@ FUNCTIONS = {
             default_result_type="number",
             private=True,
         ),
+        # The bounds of a multihistogram, these are private because aggregating
+        # `measurements_value` is only meaningful when grouped by the measurement key.
+        Function(
+            "min_value",
+            required_args=[NumericColumnNoLookup("column", allow_measurements_value=True)],
+            aggregate=["min", ArgValue("column"), None],
+            default_result_type="number",
+            private=True,
+        ),
+        Function(
+            "max_value",
+            required_args=[NumericColumnNoLookup("column", allow_measurements_value=True)],
+            aggregate=["max", ArgValue("column"), None],
+            default_result_type="number",
+            private=True,
+        ),
+        Function(
+            "quartiles",
+            required_args=[NumericColumnNoLookup("column", allow_measurements_value=True)],
+            # Both quartiles are computed from the same aggregate state and are
+            # returned as an array of `[first quartile, third quartile]`.
+            aggregate=["quantiles(0.25, 0.75)", ArgValue("column"), None],
+            default_result_type="number",
+            private=True,
+        ),
         Function(
             "count_unique",
             optional_args=[CountColumn("column")],
@@ -2351,6 +2377,7 @@ def is_function(field):
     return None
 
 
+@functools.lru_cache(maxsize=4096)
 def get_function_alias(field):
     match = FUNCTION_PATTERN.search(field)
     if match is None:
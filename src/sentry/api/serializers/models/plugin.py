@@ -1,9 +1,11 @@
 import six
 
-from sentry.api.serializers import Serializer
+from sentry.api.serializers import Serializer, serialize
+from sentry.exceptions import PluginIdentityRequired
 from sentry.utils.assets import get_asset_url
 from sentry.utils.http import absolute_uri
 from sentry.models import ProjectOption
+from django.core.urlresolvers import reverse
 from django.utils.text import slugify
 
 
@@ -93,6 +95,21 @@ class PluginWithConfigSerializer(PluginSerializer):
         return d
 
 
+def serialize_plugin_for_project(plugin, project, user):
+    """
+    Serializes a plugin along with its configuration for the given project,
+    falling back to the plain plugin representation when the user still has
+    to link an identity.
+    """
+    try:
+        return serialize(plugin, user, PluginWithConfigSerializer(project))
+    except PluginIdentityRequired as e:
+        context = serialize(plugin, user, PluginSerializer(project))
+        context["config_error"] = six.text_type(e)
+        context["auth_url"] = reverse("socialauth_associate", args=[plugin.slug])
+        return context
+
+
 def serialize_field(project, plugin, field):
     data = {
         "name": six.text_type(field["name"]),
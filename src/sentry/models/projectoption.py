@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import IntegrityError, models, router, transaction
 
 from sentry import projectoptions
 from sentry.db.models import Model, FlexibleForeignKey, sane_repr
@@ -37,6 +37,41 @@ class ProjectOptionManager(OptionManager):
         self.reload_cache(project.id, "projectoption.set_value")
         return created or inst > 0
 
+    def set_values(self, project, values):
+        """
+        Sets many options for a project at once, fetching the existing rows in
+        a single query and reloading the option cache only once.
+        """
+        if not values:
+            return
+
+        existing_keys = set(
+            self.filter(project=project, key__in=list(values.keys())).values_list("key", flat=True)
+        )
+        using = router.db_for_write(self.model)
+        to_create = []
+        with transaction.atomic(using=using):
+            for key, value in values.items():
+                if key in existing_keys:
+                    updated = self.using(using).filter(project=project, key=key).update(value=value)
+                    if updated:
+                        continue
+                # The row doesn't exist, or was deleted since it was read.
+                to_create.append(self.model(project=project, key=key, value=value))
+
+            if to_create:
+                try:
+                    with transaction.atomic(using=using):
+                        self.using(using).bulk_create(to_create)
+                except IntegrityError:
+                    # Another writer created some of these keys concurrently.
+                    for option in to_create:
+                        self.create_or_update(
+                            project=project, key=option.key, values={"value": option.value}
+                        )
+
+        self.reload_cache(project.id, "projectoption.set_values")
+
     def get_all_values(self, project):
         if isinstance(project, models.Model):
             project_id = project.id
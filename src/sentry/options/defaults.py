@@ -264,6 +264,10 @@ register("incidents-performance.rollout-rate", default=0, flags=FLAG_PRIORITIZE_
 # Max number of tags to combine in a single query in Discover2 tags facet.
 register("discover2.max_tags_to_combine", default=3, flags=FLAG_PRIORITIZE_DISK)
 
+# Fetch the values of all tags except environment in a single query in Discover2 tags facet.
+# The batched query doesn't count the events missing a tag, so this is off by default.
+register("discover2.facets_individual_batch", default=False, flags=FLAG_PRIORITIZE_DISK)
+
 # Enables setting a sampling rate when producing the tag facet.
 register("discover2.tags_facet_enable_sampling", default=True, flags=FLAG_PRIORITIZE_DISK)
 
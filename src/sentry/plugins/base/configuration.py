@@ -1,5 +1,3 @@
-import six
-
 from django.utils.translation import ugettext as _
 from django.utils.safestring import mark_safe
 from django.core.urlresolvers import reverse
@@ -8,41 +6,53 @@ from django.contrib import messages
 from django.http import Http404
 
 from sentry import options
-from sentry.api import client
 from sentry.api.serializers import serialize
+from sentry.api.serializers.models.plugin import serialize_plugin_for_project
 from sentry.models import ProjectOption
 from sentry.utils import json
 from sentry.web.helpers import render_to_string
 
 
-def react_plugin_config(plugin, project, request):
-    response = client.get(
-        "/projects/{}/{}/plugins/{}/".format(project.organization.slug, project.slug, plugin.slug),
-        request=request,
-    )
-    nonce = ""
-    if hasattr(request, "csp_nonce"):
-        nonce = ' nonce="{}"'.format(request.csp_nonce)
-
-    return mark_safe(
-        """
+REACT_PLUGIN_CONFIG_TEMPLATE = """
     <div id="ref-plugin-config"></div>
-    <script%s>
+    <script%(nonce_attr)s>
     $(function(){
-        ReactDOM.render(React.createFactory(SentryApp.PluginConfig)({
-            project: %s,
-            organization: %s,
-            data: %s
-        }), document.getElementById('ref-plugin-config'));
+        ReactDOM.render(React.createFactory(SentryApp.PluginConfig)(%(props_json)s),
+            document.getElementById('ref-plugin-config'));
     });
     </script>
     """
-        % (
-            nonce,
-            json.dumps_htmlsafe(serialize(project, request.user)),
-            json.dumps_htmlsafe(serialize(project.organization, request.user)),
-            json.dumps_htmlsafe(response.data),
-        )
+
+
+def _serialize_for_request(obj, request):
+    """
+    Serializes ``obj``, memoizing the result on the request so that rendering
+    several plugins on one page serializes each object once.
+    """
+    cache = getattr(request, "_plugin_serialize_cache", None)
+    if cache is None:
+        cache = request._plugin_serialize_cache = {}
+
+    cache_key = (type(obj).__name__, obj.id, request.user.id)
+    if cache_key not in cache:
+        cache[cache_key] = serialize(obj, request.user)
+    return cache[cache_key]
+
+
+def react_plugin_config(plugin, project, request):
+    props = {
+        "project": _serialize_for_request(project, request),
+        "organization": _serialize_for_request(project.organization, request),
+        "data": serialize_plugin_for_project(plugin, project, request.user),
+    }
+
+    nonce_attr = ""
+    if hasattr(request, "csp_nonce"):
+        nonce_attr = ' nonce="{}"'.format(request.csp_nonce)
+
+    return mark_safe(
+        REACT_PLUGIN_CONFIG_TEMPLATE
+        % {"nonce_attr": nonce_attr, "props_json": json.dumps_htmlsafe(props)}
     )
 
 
@@ -52,29 +62,32 @@ def default_plugin_config(plugin, project, request):
 
     plugin_key = plugin.get_conf_key()
     form_class = plugin.get_conf_form(project)
-    template = plugin.get_conf_template(project)
 
     if form_class is None:
         return HttpResponseRedirect(
             reverse("sentry-manage-project", args=[project.organization.slug, project.slug])
         )
 
-    test_results = None
+    is_submitted = request.method == "POST" and request.POST.get("plugin") == plugin.slug
 
     form = form_class(
-        request.POST if request.POST.get("plugin") == plugin.slug else None,
+        request.POST if is_submitted else None,
         initial=plugin.get_conf_options(project),
         prefix=plugin_key,
     )
-    if form.is_valid():
+
+    test_results = None
+    if is_submitted and form.is_valid():
         if "action_test" in request.POST and plugin.is_testable():
             test_results = plugin.test_configuration_and_get_test_results(project)
         else:
-            for field, value in six.iteritems(form.cleaned_data):
-                key = "%s:%s" % (plugin_key, field)
-                if project:
-                    ProjectOption.objects.set_value(project, key, value)
-                else:
+            values = {
+                "%s:%s" % (plugin_key, field): value for field, value in form.cleaned_data.items()
+            }
+            if project:
+                ProjectOption.objects.set_values(project, values)
+            else:
+                for key, value in values.items():
                     options.set(key, value)
 
             messages.add_message(
@@ -91,7 +104,7 @@ def default_plugin_config(plugin, project, request):
 
     return mark_safe(
         render_to_string(
-            template=template,
+            template=plugin.get_conf_template(project),
             context={
                 "form": form,
                 "plugin": plugin,
@@ -106,28 +119,47 @@ def default_plugin_config(plugin, project, request):
 
 def default_issue_plugin_config(plugin, project, form_data):
     plugin_key = plugin.get_conf_key()
-    for field, value in six.iteritems(form_data):
-        key = "%s:%s" % (plugin_key, field)
-        if project:
-            ProjectOption.objects.set_value(project, key, value)
-        else:
+    values = {"%s:%s" % (plugin_key, field): value for field, value in form_data.items()}
+    if project:
+        ProjectOption.objects.set_values(project, values)
+    else:
+        for key, value in values.items():
             options.set(key, value)
 
 
+def _get_option_keys(form_class, plugin_key):
+    """
+    Returns ``(field, option key)`` pairs for the fields of ``form_class``,
+    built once per form class and plugin key.
+    """
+    # Read from the class' own __dict__ so subclasses adding fields don't
+    # pick up the keys cached for their parent.
+    cached = form_class.__dict__.get("_sentry_option_keys")
+    if cached is None:
+        cached = {}
+        form_class._sentry_option_keys = cached
+    keys = cached.get(plugin_key)
+    if keys is None:
+        keys = cached[plugin_key] = tuple(
+            (field, "%s:%s" % (plugin_key, field)) for field in form_class.base_fields
+        )
+    return keys
+
+
 def default_plugin_options(plugin, project):
     form_class = plugin.get_conf_form(project)
     if form_class is None:
         return {}
 
-    NOTSET = object()
     plugin_key = plugin.get_conf_key()
     initials = plugin.get_form_initial(project)
-    for field in form_class.base_fields:
-        key = "%s:%s" % (plugin_key, field)
-        if project is not None:
-            value = ProjectOption.objects.get_value(project, key, NOTSET)
-        else:
-            value = options.get(key)
-        if value is not NOTSET:
-            initials[field] = value
+    if project is not None:
+        # Fetch every option for the project in one (cached) lookup rather
+        # than once per form field.
+        project_options = ProjectOption.objects.get_all_values(project)
+    for field, key in _get_option_keys(form_class, plugin_key):
+        if project is None:
+            initials[field] = options.get(key)
+        elif key in project_options:
+            initials[field] = project_options[key]
     return initials
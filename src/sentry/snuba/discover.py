@@ -1,6 +1,5 @@
 import math
 import sentry_sdk
-import six
 import logging
 
 from collections import namedtuple
@@ -18,10 +17,10 @@ from sentry.api.event_search import (
 
 from sentry.models import Group
 from sentry.tagstore.base import TOP_VALUES_DEFAULT_LIMIT
-from sentry.utils.compat import filter
 from sentry.utils.math import nice_int
 from sentry.utils.snuba import (
     Dataset,
+    bulk_raw_query,
     get_measurement_name,
     naiveify_datetime,
     raw_query,
@@ -29,6 +28,7 @@ from sentry.utils.snuba import (
     resolve_column,
     SNUBA_AND,
     SNUBA_OR,
+    SnubaQueryParams,
     SnubaTSResult,
     to_naive_timestamp,
 )
@@ -85,23 +85,25 @@ def zerofill(data, start, end, rollup, orderby):
     rv = []
     start = int(to_naive_timestamp(naiveify_datetime(start)) / rollup) * rollup
     end = (int(to_naive_timestamp(naiveify_datetime(end)) / rollup) * rollup) + rollup
-    data_by_time = {}
 
-    for obj in data:
-        if obj["time"] in data_by_time:
-            data_by_time[obj["time"]].append(obj)
-        else:
-            data_by_time[obj["time"]] = [obj]
-
-    for key in six.moves.xrange(start, end, rollup):
-        if key in data_by_time and len(data_by_time[key]) > 0:
-            rv = rv + data_by_time[key]
-            data_by_time[key] = []
+    # Walk the buckets and the time sorted rows side by side, emitting every
+    # row that falls on a bucket and a placeholder for each empty bucket.
+    data = sorted(data, key=lambda obj: obj["time"])
+    data_len = len(data)
+    i = 0
+    for key in range(start, end, rollup):
+        # skip rows that don't line up with a bucket
+        while i < data_len and data[i]["time"] < key:
+            i += 1
+        if i < data_len and data[i]["time"] == key:
+            while i < data_len and data[i]["time"] == key:
+                rv.append(data[i])
+                i += 1
         else:
             rv.append({"time": key})
 
     if "-time" in orderby:
-        return list(reversed(rv))
+        rv.reverse()
 
     return rv
 
@@ -139,24 +141,36 @@ def transform_data(result, translated_columns, snuba_filter, selected_columns=No
     if selected_columns is None:
         selected_columns = []
 
+    has_renames = bool(translated_columns)
+    rollup = snuba_filter.rollup
+    needs_zerofill = bool(rollup and rollup > 0)
+    if not has_renames and not needs_zerofill:
+        return result
+
     for col in result["meta"]:
         # Translate back column names that were converted to snuba format
         col["name"] = translated_columns.get(col["name"], col["name"])
 
-    def get_row(row):
-        transformed = {}
-        for key, value in row.items():
-            if isinstance(value, float) and math.isnan(value):
-                value = 0
-            transformed[translated_columns.get(key, key)] = value
-
-        return transformed
-
-    if len(translated_columns):
-        result["data"] = [get_row(row) for row in result["data"]]
+    if has_renames:
+        renames = [(key, name) for key, name in translated_columns.items() if key != name]
+        # Only float columns can hold NaN, columns without a type are checked to be safe.
+        float_columns = [
+            col["name"] for col in result["meta"] if "Float" in col.get("type", "Float")
+        ]
 
-    rollup = snuba_filter.rollup
-    if rollup and rollup > 0:
+        # The rows belong to this result, so they are updated in place
+        # rather than copied.
+        for row in result["data"]:
+            if renames:
+                renamed = [(name, row.pop(key)) for key, name in renames if key in row]
+                row.update(renamed)
+            for name in float_columns:
+                value = row.get(name)
+                # NaN is the only value not equal to itself
+                if isinstance(value, float) and value != value:
+                    row[name] = 0
+
+    if needs_zerofill:
         with sentry_sdk.start_span(
             op="discover.discover", description="transform_results.zerofill"
         ) as span:
@@ -168,6 +182,21 @@ def transform_data(result, translated_columns, snuba_filter, selected_columns=No
     return result
 
 
+def get_having_function_aliases(function):
+    """
+    Yield the alias referenced by each function in a nested having condition.
+
+    Functions are of the form [fn, [args]], where `and`/`or` functions take
+    other functions as their args.
+    """
+    if function[0] in [SNUBA_AND, SNUBA_OR]:
+        for arg in function[1]:
+            yield from get_having_function_aliases(arg)
+    # Only need to look at the args if they're a list
+    elif isinstance(function[1], (list, tuple)):
+        yield function[1][0]
+
+
 def query(
     selected_columns,
     query,
@@ -247,27 +276,17 @@ def query(
         )
 
         # Make sure that any aggregate conditions are also in the selected columns
+        agg_aliases = {agg_clause[-1] for agg_clause in snuba_filter.aggregations}
         for having_clause in snuba_filter.having:
             # The first element of the having can be an alias, or a nested array of functions. Loop through to make sure
             # any referenced functions are in the aggregations.
             error_extra = ", and could not be automatically added" if auto_aggregations else ""
             if isinstance(having_clause[0], (list, tuple)):
-                # Functions are of the form [fn, [args]]
-                args_to_check = [[having_clause[0]]]
-                conditions_not_in_aggregations = []
-                while len(args_to_check) > 0:
-                    args = args_to_check.pop()
-                    for arg in args:
-                        if arg[0] in [SNUBA_AND, SNUBA_OR]:
-                            args_to_check.extend(arg[1])
-                        # Only need to iterate on arg[1] if its a list
-                        elif isinstance(arg[1], (list, tuple)):
-                            alias = arg[1][0]
-                            found = any(
-                                alias == agg_clause[-1] for agg_clause in snuba_filter.aggregations
-                            )
-                            if not found:
-                                conditions_not_in_aggregations.append(alias)
+                conditions_not_in_aggregations = [
+                    alias
+                    for alias in get_having_function_aliases(having_clause[0])
+                    if alias not in agg_aliases
+                ]
 
                 if len(conditions_not_in_aggregations) > 0:
                     raise InvalidSearchQuery(
@@ -276,17 +295,13 @@ def query(
                             error_extra,
                         )
                     )
-            else:
-                found = any(
-                    having_clause[0] == agg_clause[-1] for agg_clause in snuba_filter.aggregations
-                )
-                if not found:
-                    raise InvalidSearchQuery(
-                        "Aggregate {} used in a condition but is not a selected column{}.".format(
-                            having_clause[0],
-                            error_extra,
-                        )
+            elif having_clause[0] not in agg_aliases:
+                raise InvalidSearchQuery(
+                    "Aggregate {} used in a condition but is not a selected column{}.".format(
+                        having_clause[0],
+                        error_extra,
                     )
+                )
 
         if conditions is not None:
             snuba_filter.conditions.extend(conditions)
@@ -387,20 +402,41 @@ def timeseries_query(selected_columns, query, params, rollup, referrer=None):
         return SnubaTSResult({"data": result}, snuba_filter.start, snuba_filter.end, rollup)
 
 
-def create_result_key(result_row, fields, issues):
-    values = []
-    for field in fields:
-        if field == "issue.id":
-            values.append(issues.get(result_row["issue.id"], "unknown"))
-        else:
-            value = result_row.get(field)
+def build_key_fn(fields, issues):
+    """
+    Build a function that creates the result key of a row. The lookup for
+    each field is chosen once here instead of on every row.
+
+    fields (Sequence[str]) The fields that make up the key, in order.
+    issues (Dict[int, str]) Mapping of issue ids to their short ids.
+    """
+
+    def issue_extractor(row):
+        return issues.get(row["issue.id"], "unknown")
+
+    def field_extractor(field):
+        def extract(row):
+            value = row.get(field)
             if isinstance(value, list):
-                if len(value) > 0:
-                    value = value[-1]
-                else:
-                    value = ""
-            values.append(six.text_type(value))
-    return ",".join(values)
+                value = value[-1] if value else ""
+            return str(value)
+
+        return extract
+
+    extractors = tuple(
+        issue_extractor if field == "issue.id" else field_extractor(field) for field in fields
+    )
+
+    # A single field is its own key, no need to join anything
+    if len(extractors) == 1:
+        return extractors[0]
+
+    def create_result_key(row):
+        # join builds a sequence from its argument anyways, a list comprehension
+        # avoids the overhead of going through a generator
+        return ",".join([extractor(row) for extractor in extractors])
+
+    return create_result_key
 
 
 def top_events_timeseries(
@@ -463,30 +499,41 @@ def top_events_timeseries(
             default_count=False,
         )
 
+        fields = []
         for field in selected_columns:
             # project is handled by filter_keys already
             if field in ["project", "project.id"]:
                 continue
-            if field in FIELD_ALIASES:
-                field = FIELD_ALIASES[field].alias
-            # Note that because orderby shouldn't be an array field its not included in the values
-            values = list(
-                {
-                    event.get(field)
-                    for event in top_events["data"]
-                    if field in event and not isinstance(event.get(field), list)
-                }
-            )
+            field_alias = FIELD_ALIASES.get(field)
+            if field_alias is not None:
+                field = field_alias.alias
+            fields.append(field)
+
+        # Collect the values of every field in a single pass over the top events.
+        # Note that because orderby shouldn't be an array field its not included in the values
+        values_by_field = {field: set() for field in fields}
+        for event in top_events["data"]:
+            for field in fields:
+                if field in event:
+                    value = event[field]
+                    if not isinstance(value, list):
+                        values_by_field[field].add(value)
+
+        for field in fields:
+            values = list(values_by_field[field])
             if values:
                 # timestamp needs special handling, creating a big OR instead
                 if field == "timestamp":
                     snuba_filter.conditions.append([["timestamp", "=", value] for value in values])
                 elif None in values:
+                    resolved_field = resolve_discover_column(field)
                     non_none_values = [value for value in values if value is not None]
-                    condition = [[["isNull", [resolve_discover_column(field)]], "=", 1]]
+                    condition = [[["isNull", [resolved_field]], "=", 1]]
                     if non_none_values:
-                        condition.append([resolve_discover_column(field), "IN", non_none_values])
+                        condition.append([resolved_field, "IN", non_none_values])
                     snuba_filter.conditions.append(condition)
+                # Aliases that resolve to themselves (eg. error.unhandled) are expressions
+                # the query already selects, so they can be filtered on directly.
                 elif field in FIELD_ALIASES:
                     snuba_filter.conditions.append([field, "IN", values])
                 else:
@@ -524,27 +571,28 @@ def top_events_timeseries(
 
         if "project" in selected_columns:
             translated_columns["project_id"] = "project"
-        translated_groupby = [
-            translated_columns.get(groupby, groupby) for groupby in snuba_filter.groupby
-        ]
+        # sorted so the result key is consistent
+        translated_groupby = tuple(
+            sorted(translated_columns.get(groupby, groupby) for groupby in snuba_filter.groupby)
+        )
 
         issues = {}
         if "issue" in selected_columns:
             issues = Group.issues_mapping(
-                set([event["issue.id"] for event in top_events["data"]]),
+                {event["issue.id"] for event in top_events["data"]},
                 params["project_id"],
                 organization,
             )
-        # so the result key is consistent
-        translated_groupby.sort()
+
+        create_result_key = build_key_fn(translated_groupby, issues)
 
         results = {}
         # Using the top events add the order to the results
         for index, item in enumerate(top_events["data"]):
-            result_key = create_result_key(item, translated_groupby, issues)
+            result_key = create_result_key(item)
             results[result_key] = {"order": index, "data": []}
         for row in result["data"]:
-            result_key = create_result_key(row, translated_groupby, issues)
+            result_key = create_result_key(row)
             if result_key in results:
                 results[result_key]["data"].append(row)
             else:
@@ -552,7 +600,7 @@ def top_events_timeseries(
                     "discover.top-events.timeseries.key-mismatch",
                     extra={"result_key": result_key, "top_event_keys": list(results.keys())},
                 )
-        for key, item in six.iteritems(results):
+        for key, item in results.items():
             results[key] = SnubaTSResult(
                 {
                     "data": zerofill(
@@ -611,7 +659,7 @@ def get_facets(query, params, limit=10, referrer=None):
             aggregations=[["count", None, "count"]],
             start=snuba_filter.start,
             end=snuba_filter.end,
-            conditions=snuba_filter.conditions,
+            conditions=list(snuba_filter.conditions),
             filter_keys=snuba_filter.filter_keys,
             orderby=["-count", "tags_key"],
             groupby="tags_key",
@@ -640,98 +688,112 @@ def get_facets(query, params, limit=10, referrer=None):
             top_tags.pop()
         fetch_projects = True
 
-    results = []
-    if fetch_projects:
-        with sentry_sdk.start_span(op="discover.discover", description="facets.projects"):
-            project_values = raw_query(
-                aggregations=[["count", None, "count"]],
-                start=snuba_filter.start,
-                end=snuba_filter.end,
-                conditions=snuba_filter.conditions,
-                filter_keys=snuba_filter.filter_keys,
-                groupby="project_id",
-                orderby="-count",
-                dataset=Dataset.Discover,
-                referrer=referrer,
-                sample=sample_rate,
-                # Ensures Snuba will not apply FINAL
-                turbo=sample_rate is not None,
-            )
-            results.extend(
-                [
-                    FacetResult("project", r["project_id"], int(r["count"]) * multiplier)
-                    for r in project_values["data"]
-                ]
-            )
-
     # Get tag counts for our top tags. Fetching them individually
     # allows snuba to leverage promoted tags better and enables us to get
-    # the value count we want.
+    # the value count we want. When batching is enabled only the tags that
+    # must stay individual are fetched on their own.
     max_aggregate_tags = options.get("discover2.max_tags_to_combine")
+    batch_individual_tags = options.get("discover2.facets_individual_batch")
     individual_tags = []
     aggregate_tags = []
     for i, tag in enumerate(top_tags):
         if tag == "environment":
             # Add here tags that you want to be individual
             individual_tags.append(tag)
-        elif i >= len(top_tags) - max_aggregate_tags:
+        elif batch_individual_tags or i >= len(top_tags) - max_aggregate_tags:
             aggregate_tags.append(tag)
         else:
             individual_tags.append(tag)
 
-    with sentry_sdk.start_span(
-        op="discover.discover", description="facets.individual_tags"
-    ) as span:
-        span.set_data("tag_count", len(individual_tags))
-        for tag_name in individual_tags:
-            tag = "tags[{}]".format(tag_name)
-            tag_values = raw_query(
+    # The remaining queries don't depend on each other, so they are sent to
+    # snuba together and run concurrently. Each query gets its own copy of the
+    # conditions as they are extended while the query is prepared.
+    snuba_params = []
+    if fetch_projects:
+        snuba_params.append(
+            SnubaQueryParams(
                 aggregations=[["count", None, "count"]],
-                conditions=snuba_filter.conditions,
+                start=snuba_filter.start,
+                end=snuba_filter.end,
+                conditions=list(snuba_filter.conditions),
+                filter_keys=snuba_filter.filter_keys,
+                groupby="project_id",
+                orderby="-count",
+                dataset=Dataset.Discover,
+                sample=sample_rate,
+                # Ensures Snuba will not apply FINAL
+                turbo=sample_rate is not None,
+            )
+        )
+
+    for tag_name in individual_tags:
+        snuba_params.append(
+            SnubaQueryParams(
+                aggregations=[["count", None, "count"]],
+                conditions=list(snuba_filter.conditions),
                 start=snuba_filter.start,
                 end=snuba_filter.end,
                 filter_keys=snuba_filter.filter_keys,
                 orderby=["-count"],
-                groupby=[tag],
+                groupby=["tags[{}]".format(tag_name)],
                 limit=TOP_VALUES_DEFAULT_LIMIT,
                 dataset=Dataset.Discover,
-                referrer=referrer,
                 sample=sample_rate,
                 # Ensures Snuba will not apply FINAL
                 turbo=sample_rate is not None,
             )
-            results.extend(
-                [
-                    FacetResult(tag_name, r[tag], int(r["count"]) * multiplier)
-                    for r in tag_values["data"]
-                ]
-            )
+        )
 
     if aggregate_tags:
-        with sentry_sdk.start_span(op="discover.discover", description="facets.aggregate_tags"):
-            conditions = snuba_filter.conditions
-            conditions.append(["tags_key", "IN", aggregate_tags])
-            tag_values = raw_query(
+        snuba_params.append(
+            SnubaQueryParams(
                 aggregations=[["count", None, "count"]],
-                conditions=conditions,
+                conditions=snuba_filter.conditions + [["tags_key", "IN", aggregate_tags]],
                 start=snuba_filter.start,
                 end=snuba_filter.end,
                 filter_keys=snuba_filter.filter_keys,
                 orderby=["tags_key", "-count"],
                 groupby=["tags_key", "tags_value"],
                 dataset=Dataset.Discover,
-                referrer=referrer,
                 sample=sample_rate,
                 # Ensures Snuba will not apply FINAL
                 turbo=sample_rate is not None,
                 limitby=[TOP_VALUES_DEFAULT_LIMIT, "tags_key"],
             )
-            results.extend(
-                [
-                    FacetResult(r["tags_key"], r["tags_value"], int(r["count"]) * multiplier)
-                    for r in tag_values["data"]
-                ]
-            )
+        )
+
+    with sentry_sdk.start_span(op="discover.discover", description="facets.tag_values") as span:
+        span.set_data("query_count", len(snuba_params))
+        query_results = iter(bulk_raw_query(snuba_params, referrer=referrer))
+
+    results = []
+    if fetch_projects:
+        project_values = next(query_results)
+        results.extend(
+            [
+                FacetResult("project", r["project_id"], int(r["count"]) * multiplier)
+                for r in project_values["data"]
+            ]
+        )
+
+    for tag_name in individual_tags:
+        tag = "tags[{}]".format(tag_name)
+        tag_values = next(query_results)
+        results.extend(
+            [
+                FacetResult(tag_name, r[tag], int(r["count"]) * multiplier)
+                for r in tag_values["data"]
+            ]
+        )
+
+    if aggregate_tags:
+        tag_values = next(query_results)
+        results.extend(
+            [
+                FacetResult(r["tags_key"], r["tags_value"], int(r["count"]) * multiplier)
+                for r in tag_values["data"]
+            ]
+        )
 
     return results
 
@@ -770,16 +832,8 @@ def histogram_query(
     :param str data_filter: Indicate the filter strategy to be applied to the data.
     """
 
-    multiplier = int(10 ** precision)
-    if max_value is not None:
-        # We want the specified max_value to be exclusive, and the queried max_value
-        # to be inclusive. So we adjust the specified max_value using the multiplier.
-        max_value -= 0.1 / multiplier
-    min_value, max_value = find_histogram_min_max(
-        fields, min_value, max_value, user_query, params, data_filter
-    )
-
     key_column = None
+    key_alias = None
     conditions = []
     if len(fields) > 1:
         key_column = "array_join(measurements_key)"
@@ -794,12 +848,28 @@ def histogram_query(
             measurements.append(measurement)
         conditions.append([key_alias, "IN", measurements])
 
+    multiplier = int(10 ** precision)
+    if max_value is not None:
+        # We want the specified max_value to be exclusive, and the queried max_value
+        # to be inclusive. So we adjust the specified max_value using the multiplier.
+        max_value -= 0.1 / multiplier
+    min_value, max_value = find_histogram_min_max(
+        fields, min_value, max_value, user_query, params, data_filter
+    )
+
     histogram_params = find_histogram_params(num_buckets, min_value, max_value, multiplier)
     histogram_column = get_histogram_column(fields, key_column, histogram_params)
     histogram_alias = get_function_alias(histogram_column)
 
     if min_value is None or max_value is None:
-        return normalize_histogram_results(fields, key_column, histogram_params, {"data": []})
+        return normalize_histogram_results(
+            fields,
+            key_column,
+            histogram_params,
+            {"data": []},
+            histogram_alias=histogram_alias,
+            key_alias=key_alias,
+        )
     # make sure to bound the bins to get the desired range of results
     if min_value is not None:
         min_bin = histogram_params.start_offset
@@ -820,7 +890,14 @@ def histogram_query(
         functions_acl=["array_join", "histogram"],
     )
 
-    return normalize_histogram_results(fields, key_column, histogram_params, results)
+    return normalize_histogram_results(
+        fields,
+        key_column,
+        histogram_params,
+        results,
+        histogram_alias=histogram_alias,
+        key_alias=key_alias,
+    )
 
 
 def get_histogram_column(fields, key_column, histogram_params):
@@ -877,10 +954,9 @@ def find_histogram_params(num_buckets, min_value, max_value, multiplier):
     if start_offset + num_buckets * bucket_size <= scaled_max:
         bucket_size = nice_int(bucket_size + 1)
 
-    # compute the bin for max value and adjust the number of buckets accordingly
-    # to minimize unnecessary empty bins at the tail
-    last_bin = int((scaled_max - start_offset) / bucket_size) * bucket_size + start_offset
-    num_buckets = (last_bin - start_offset) // bucket_size + 1
+    # only keep enough buckets to reach the bin of the max value to minimize
+    # unnecessary empty bins at the tail
+    num_buckets = int((scaled_max - start_offset) / bucket_size) + 1
 
     return HistogramParams(num_buckets, bucket_size, start_offset, multiplier)
 
@@ -903,76 +979,96 @@ def find_histogram_min_max(fields, min_value, max_value, user_query, params, dat
     if min_value is not None and max_value is not None:
         return min_value, max_value
 
+    columns = []
+    conditions = []
+    bound_fields = fields
+    min_function, max_function = "min", "max"
+    if len(fields) > 1:
+        # A multihistogram is only possible on measurements, so rather than
+        # aggregating every measurement as its own column, find the bounds of all
+        # of them in a single pass over `measurements_value` grouped by the key.
+        key_column = "array_join(measurements_key)"
+        columns.append(key_column)
+        measurements = [get_measurement_name(field) for field in fields]
+        conditions.append([get_function_alias(key_column), "IN", measurements])
+        bound_fields = ["measurements_value"]
+        # the public min/max functions don't accept `measurements_value`
+        min_function, max_function = "min_value", "max_value"
+
     min_columns = []
     max_columns = []
     quartiles = []
-    for field in fields:
+    for field in bound_fields:
         if min_value is None:
-            min_columns.append("min({})".format(field))
+            min_columns.append("{}({})".format(min_function, field))
         if max_value is None:
-            max_columns.append("max({})".format(field))
-        if data_filter == "exclude_outliers":
-            quartiles.append("percentile({}, 0.25)".format(field))
-            quartiles.append("percentile({}, 0.75)".format(field))
+            max_columns.append("{}({})".format(max_function, field))
+        # the quartiles are only used to cap the queried max, so they aren't
+        # needed when the max has already been specified
+        if max_value is None and data_filter == "exclude_outliers":
+            quartiles.append("quartiles({})".format(field))
 
     results = query(
-        selected_columns=min_columns + max_columns + quartiles,
+        selected_columns=columns + min_columns + max_columns + quartiles,
+        conditions=conditions,
         query=user_query,
         params=params,
-        limit=1,
+        limit=len(fields),
         referrer="api.organization-events-histogram-min-max",
+        functions_acl=["array_join", "min_value", "max_value", "quartiles"],
     )
 
     data = results.get("data")
 
-    # there should be exactly 1 row in the results, but if something went wrong here,
-    # we force the min/max to be None to coerce an empty histogram
-    if data is None or len(data) != 1:
+    # there should be exactly 1 row in the results (or 1 row per measurement with
+    # data for multihistograms), but if something went wrong here, we force the
+    # min/max to be None to coerce an empty histogram
+    if not data or (len(fields) == 1 and len(data) != 1):
         return None, None
 
-    row = data[0]
-
     if min_value is None:
-        min_values = [row[get_function_alias(column)] for column in min_columns]
-        min_values = list(filter(lambda v: v is not None, min_values))
-        min_value = min(min_values) if min_values else None
+        min_aliases = [get_function_alias(column) for column in min_columns]
+        min_values = (row[alias] for row in data for alias in min_aliases)
+        min_value = min((v for v in min_values if v is not None), default=None)
 
     if max_value is None:
-        max_values = [row[get_function_alias(column)] for column in max_columns]
-        max_values = list(filter(lambda v: v is not None, max_values))
-        max_value = max(max_values) if max_values else None
+        max_aliases = [get_function_alias(column) for column in max_columns]
+        max_values = (row[alias] for row in data for alias in max_aliases)
+        max_value = max((v for v in max_values if v is not None), default=None)
 
         fences = []
         if data_filter == "exclude_outliers":
-            for field in fields:
-                q1_alias = get_function_alias("percentile({}, 0.25)".format(field))
-                q3_alias = get_function_alias("percentile({}, 0.75)".format(field))
+            quartile_aliases = [get_function_alias(column) for column in quartiles]
+            for row in data:
+                for alias in quartile_aliases:
+                    if row[alias] is None:
+                        continue
 
-                first_quartile = row[q1_alias]
-                third_quartile = row[q3_alias]
+                    first_quartile, third_quartile = row[alias]
 
-                if (
-                    first_quartile is None
-                    or third_quartile is None
-                    or math.isnan(first_quartile)
-                    or math.isnan(third_quartile)
-                ):
-                    continue
+                    if (
+                        first_quartile is None
+                        or third_quartile is None
+                        or math.isnan(first_quartile)
+                        or math.isnan(third_quartile)
+                    ):
+                        continue
 
-                interquartile_range = abs(third_quartile - first_quartile)
-                upper_outer_fence = third_quartile + 3 * interquartile_range
-                fences.append(upper_outer_fence)
+                    interquartile_range = abs(third_quartile - first_quartile)
+                    upper_outer_fence = third_quartile + 3 * interquartile_range
+                    fences.append(upper_outer_fence)
 
-        max_fence_value = max(fences) if fences else None
+        max_fence_value = max(fences, default=None)
 
-        candidates = [max_fence_value, max_value]
-        candidates = list(filter(lambda v: v is not None, candidates))
-        max_value = min(candidates) if candidates else None
+        candidates = (max_fence_value, max_value)
+        max_value = min((v for v in candidates if v is not None), default=None)
 
     return min_value, max_value
 
 
-def normalize_histogram_results(fields, key_column, histogram_params, results):
+def normalize_histogram_results(
+    fields, key_column, histogram_params, results, histogram_alias=None, key_alias=None
+):
     """
     Normalizes the histogram results by renaming the columns to key and bin
     and make sure to zerofill any missing values.
@@ -983,38 +1079,48 @@ def normalize_histogram_results(fields, key_column, histogram_params, results):
     :param HistogramParms histogram_params: The histogram parameters used.
     :param any results: The results from the histogram query that may be missing
         bins and needs to be normalized.
+    :param str histogram_alias: The alias of the histogram column if the caller already
+        has it, otherwise it is derived from `histogram_params`.
+    :param str key_alias: The alias of the key column if the caller already has it,
+        otherwise it is derived from `key_column`.
     """
 
     # `key_name` is only used when generating a multi histogram of measurement values.
     # It contains the name of the corresponding measurement for that row.
-    key_name = None if key_column is None else get_function_alias(key_column)
-    histogram_column = get_histogram_column(fields, key_column, histogram_params)
-    bin_name = get_function_alias(histogram_column)
+    key_name = key_alias
+    if key_name is None and key_column is not None:
+        key_name = get_function_alias(key_column)
+    bin_name = histogram_alias
+    if bin_name is None:
+        histogram_column = get_histogram_column(fields, key_column, histogram_params)
+        bin_name = get_function_alias(histogram_column)
 
-    # zerofill and rename the columns while making sure to adjust for precision
-    bucket_maps = {field: {} for field in fields}
+    num_buckets, bucket_size, start_offset, multiplier = histogram_params
+
+    # map the measurement names back to their fields once rather than per row
+    field_lookup = {} if key_name is None else {get_measurement_name(f): f for f in fields}
+
+    # zerofill up front so that every row can be written straight into its bucket
+    counts = {field: [0] * num_buckets for field in fields}
     for row in results["data"]:
         # Fall back to the first field name if there is no `key_name`,
-        # otherwise, this is a measurement name and format it as such.
-        key = fields[0] if key_name is None else "measurements.{}".format(row[key_name])
+        # otherwise, this is a measurement name and look up its field.
+        key = fields[0] if key_name is None else field_lookup.get(row[key_name])
         # we expect the bin the be an integer, this is because all floating
         # point values are rounded during the calculation
-        bucket = int(row[bin_name])
-        # ignore unexpected keys
-        if key in bucket_maps:
-            bucket_maps[key][bucket] = row["count"]
-
-    new_data = {field: [] for field in fields}
-    for i in range(histogram_params.num_buckets):
-        bucket = histogram_params.start_offset + histogram_params.bucket_size * i
-        for field in fields:
-            row = {
-                "bin": bucket,
-                "count": bucket_maps[field].get(bucket, 0),
-            }
-            # make sure to adjust for the precision if necessary
-            if histogram_params.multiplier > 1:
-                row["bin"] /= float(histogram_params.multiplier)
-            new_data[field].append(row)
-
-    return new_data
+        index, remainder = divmod(int(row[bin_name]) - start_offset, bucket_size)
+        # ignore unexpected keys and bins that do not line up with the histogram
+        if key in counts and remainder == 0 and 0 <= index < num_buckets:
+            counts[key][index] = row["count"]
+
+    # every field shares the same bins, so only compute them once
+    bins = [start_offset + bucket_size * i for i in range(num_buckets)]
+    # make sure to adjust for the precision if necessary
+    if multiplier > 1:
+        bins = [bucket / float(multiplier) for bucket in bins]
+
+    # rename the columns to bin and count
+    return {
+        field: [{"bin": bucket, "count": count} for bucket, count in zip(bins, counts[field])]
+        for field in fields
+    }
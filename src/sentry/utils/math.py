@@ -1,4 +1,5 @@
 import math
+from bisect import bisect_left
 
 
 def mean(values):
@@ -30,6 +31,12 @@ def mad(values, K=1.4826):
     return K * median([abs(val - med) for val in values])
 
 
+# The "nice" steps used by `nice_int` for each order of magnitude, in ascending order.
+NICE_INT_STEPS_ONES = (1, 2, 5, 10)
+NICE_INT_STEPS_TENS = (10, 20, 25, 50, 100)
+NICE_INT_STEPS = (100, 120, 200, 250, 500, 750, 1000)
+
+
 def nice_int(x):
     """
     Round away from zero to the nearest "nice" number.
@@ -43,20 +50,18 @@ def nice_int(x):
 
     if x < 10:
         rounded = 1
-        steps = [1, 2, 5, 10]
+        steps = NICE_INT_STEPS_ONES
     elif x < 100:
         rounded = 1
-        steps = [10, 20, 25, 50, 100]
+        steps = NICE_INT_STEPS_TENS
     else:
         exp = int(math.log10(x))
         rounded = 10 ** (exp - 2)
-        steps = [100, 120, 200, 250, 500, 750, 1000]
-
-    nice_frac = steps[-1]
-    frac = x / rounded
-    for step in steps:
-        if frac <= step:
-            nice_frac = step
-            break
+        steps = NICE_INT_STEPS
+
+    # the first step that is at least `frac`, the steps are sorted so bisect
+    # finds it without walking the whole list
+    index = bisect_left(steps, x / rounded)
+    nice_frac = steps[min(index, len(steps) - 1)]
 
     return sign * nice_frac * rounded
@@ -2521,6 +2521,49 @@ class ResolveFieldListTest(unittest.TestCase):
             resolve_field_list(fields, eventstore.Filter())
         assert "no access to private function" in six.text_type(err)
 
+    def test_quartiles_function(self):
+        fields = ["quartiles(measurements.foo)"]
+        result = resolve_field_list(fields, eventstore.Filter(), functions_acl=["quartiles"])
+        assert result["aggregations"] == [
+            ["quantiles(0.25, 0.75)", "measurements.foo", "quartiles_measurements_foo"],
+        ]
+
+    def test_quartiles_function_no_access(self):
+        fields = ["quartiles(measurements.foo)"]
+        with pytest.raises(InvalidSearchQuery) as err:
+            resolve_field_list(fields, eventstore.Filter())
+        assert "no access to private function" in six.text_type(err)
+
+    def test_measurements_value_bound_functions(self):
+        fields = [
+            "array_join(measurements_key)",
+            "min_value(measurements_value)",
+            "max_value(measurements_value)",
+        ]
+        result = resolve_field_list(
+            fields, eventstore.Filter(), functions_acl=["array_join", "min_value", "max_value"]
+        )
+        assert result["selected_columns"] == [
+            ["arrayJoin", ["measurements_key"], "array_join_measurements_key"],
+        ]
+        assert result["aggregations"] == [
+            ["min", [["arrayJoin", ["measurements_value"]]], "min_value_measurements_value"],
+            ["max", [["arrayJoin", ["measurements_value"]]], "max_value_measurements_value"],
+        ]
+        assert result["groupby"] == ["array_join_measurements_key"]
+
+    def test_measurements_value_bound_functions_no_access(self):
+        fields = ["min_value(measurements_value)"]
+        with pytest.raises(InvalidSearchQuery) as err:
+            resolve_field_list(fields, eventstore.Filter())
+        assert "no access to private function" in six.text_type(err)
+
+    def test_measurements_value_public_functions(self):
+        for fields in [["min(measurements_value)"], ["max(measurements_value)"]]:
+            with pytest.raises(InvalidSearchQuery) as err:
+                resolve_field_list(fields, eventstore.Filter())
+            assert "measurements_value is not a valid column" in six.text_type(err)
+
     def test_count_at_least_function(self):
         fields = ["count_at_least(measurements.baz, 1000)"]
         result = resolve_field_list(fields, eventstore.Filter())
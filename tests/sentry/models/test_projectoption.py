@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
 
 
+from django.db import IntegrityError
+from django.db.models.query import QuerySet
+from sentry.utils.compat.mock import Mock, patch
+
 from sentry.models import ProjectOption
 from sentry.testutils import TestCase
 
@@ -10,6 +14,40 @@ class ProjectOptionManagerTest(TestCase):
         ProjectOption.objects.set_value(self.project, "foo", "bar")
         assert ProjectOption.objects.get(project=self.project, key="foo").value == "bar"
 
+    def test_set_values(self):
+        ProjectOption.objects.create(project=self.project, key="foo", value="bar")
+        ProjectOption.objects.set_values(self.project, {"foo": "baz", "biz": "boz"})
+        assert ProjectOption.objects.get(project=self.project, key="foo").value == "baz"
+        assert ProjectOption.objects.get(project=self.project, key="biz").value == "boz"
+        assert ProjectOption.objects.get_value(self.project, "biz") == "boz"
+
+    def test_set_values_unchanged(self):
+        ProjectOption.objects.create(project=self.project, key="foo", value="bar")
+        ProjectOption.objects.set_values(self.project, {"foo": "bar"})
+        assert ProjectOption.objects.get(project=self.project, key="foo").value == "bar"
+        assert ProjectOption.objects.filter(project=self.project).count() == 1
+
+    def test_set_values_deleted_after_read(self):
+        original_filter = ProjectOption.objects.filter
+
+        def filter(*args, **kwargs):
+            # the row is read as existing, but is gone by the time it's updated
+            if "key__in" in kwargs:
+                queryset = Mock()
+                queryset.values_list.return_value = ["foo"]
+                return queryset
+            return original_filter(*args, **kwargs)
+
+        with patch.object(ProjectOption.objects, "filter", side_effect=filter):
+            ProjectOption.objects.set_values(self.project, {"foo": "baz"})
+        assert ProjectOption.objects.get(project=self.project, key="foo").value == "baz"
+
+    def test_set_values_integrity_error(self):
+        with patch.object(QuerySet, "bulk_create", side_effect=IntegrityError):
+            ProjectOption.objects.set_values(self.project, {"foo": "bar", "biz": "boz"})
+        assert ProjectOption.objects.get(project=self.project, key="foo").value == "bar"
+        assert ProjectOption.objects.get(project=self.project, key="biz").value == "boz"
+
     def test_get_value(self):
         result = ProjectOption.objects.get_value(self.project, "foo")
         assert result is None
@@ -5,6 +5,7 @@ from sentry.utils.compat.mock import patch
 from datetime import datetime, timedelta
 
 from sentry.api.event_search import InvalidSearchQuery
+from sentry.eventstore import Filter
 from sentry.snuba import discover
 from sentry.testutils import TestCase, SnubaTestCase
 from sentry.testutils.helpers.datetime import iso_format, before_now
@@ -1414,6 +1415,53 @@ class QueryTransformTest(TestCase):
                 auto_aggregations=True,
             )
 
+    @patch("sentry.snuba.discover.raw_query")
+    def test_nested_boolean_aggregate_conditions(self, mock_query):
+        mock_query.return_value = {
+            "meta": [{"name": "transaction"}, {"name": "max_time"}],
+            "data": [{"transaction": "api.do_things", "max_time": 200}],
+        }
+        start_time = before_now(minutes=10)
+        end_time = before_now(seconds=1)
+
+        discover.query(
+            selected_columns=["transaction", "max(time)", "min(time)", "p95()"],
+            query="max(time):>5 OR (min(time):<10 AND p95():>1)",
+            params={"project_id": [self.project.id], "start": start_time, "end": end_time},
+            use_aggregate_conditions=True,
+        )
+        assert mock_query.call_count == 1
+        having = mock_query.call_args[1]["having"]
+        assert len(having) == 1
+        assert having[0][0][0] == "or"
+
+    @patch("sentry.snuba.discover.raw_query")
+    def test_nested_boolean_aggregate_conditions_missing_selected_column(self, mock_query):
+        start_time = before_now(minutes=10)
+        end_time = before_now(seconds=1)
+
+        # an aggregate directly under an `or`
+        with pytest.raises(
+            InvalidSearchQuery, match=r"Aggregate\(s\) min_time used in a condition"
+        ):
+            discover.query(
+                selected_columns=["transaction", "max(time)"],
+                query="max(time):>5 OR min(time):<10",
+                params={"project_id": [self.project.id], "start": start_time, "end": end_time},
+                use_aggregate_conditions=True,
+            )
+
+        # an aggregate under an `and` nested in an `or`
+        with pytest.raises(InvalidSearchQuery, match=r"Aggregate\(s\) p95 used in a condition"):
+            discover.query(
+                selected_columns=["transaction", "max(time)", "min(time)"],
+                query="max(time):>5 OR (min(time):<10 AND p95():>1)",
+                params={"project_id": [self.project.id], "start": start_time, "end": end_time},
+                use_aggregate_conditions=True,
+            )
+
+        assert not mock_query.called
+
     @patch("sentry.snuba.discover.raw_query")
     def test_no_aggregate_conditions_with_auto(self, mock_query):
         mock_query.return_value = {
@@ -1579,6 +1627,83 @@ class QueryTransformTest(TestCase):
         )
         assert values == (1.23, 3.45)
 
+        # use the given max, so the quartiles aren't needed to exclude outliers
+        mock_query.side_effect = [
+            {"meta": [{"name": "min_measurements_foo"}], "data": [{"min_measurements_foo": 1.23}]},
+        ]
+        values = discover.find_histogram_min_max(
+            ["measurements.foo"],
+            None,
+            3.45,
+            "",
+            {"project_id": [self.project.id]},
+            "exclude_outliers",
+        )
+        assert values == (1.23, 3.45)
+        aggregations = mock_query.call_args[1]["aggregations"]
+        assert [aggregation[2] for aggregation in aggregations] == ["min_measurements_foo"]
+
+        # cap the queried max at the upper outer fence of the quartiles
+        mock_query.side_effect = [
+            {
+                "meta": [{"name": "max_measurements_foo"}, {"name": "quartiles_measurements_foo"}],
+                "data": [{"max_measurements_foo": 100, "quartiles_measurements_foo": [1, 3]}],
+            },
+        ]
+        values = discover.find_histogram_min_max(
+            ["measurements.foo"],
+            0,
+            None,
+            "",
+            {"project_id": [self.project.id]},
+            "exclude_outliers",
+        )
+        assert values == (0, 9)
+
+        # cap the queried max at the largest upper outer fence across measurements,
+        # skipping measurements whose quartiles are null or NaN
+        mock_query.side_effect = [
+            {
+                "meta": [
+                    {"name": "array_join_measurements_key"},
+                    {"name": "max_value_measurements_value"},
+                    {"name": "quartiles_measurements_value"},
+                ],
+                "data": [
+                    {
+                        "array_join_measurements_key": "foo",
+                        "max_value_measurements_value": 100,
+                        "quartiles_measurements_value": [1, 3],
+                    },
+                    {
+                        "array_join_measurements_key": "bar",
+                        "max_value_measurements_value": 200,
+                        "quartiles_measurements_value": [10, 20],
+                    },
+                    {
+                        "array_join_measurements_key": "baz",
+                        "max_value_measurements_value": 300,
+                        "quartiles_measurements_value": None,
+                    },
+                    {
+                        "array_join_measurements_key": "qux",
+                        "max_value_measurements_value": 400,
+                        "quartiles_measurements_value": [float("nan"), float("nan")],
+                    },
+                ],
+            },
+        ]
+        values = discover.find_histogram_min_max(
+            ["measurements.foo", "measurements.bar", "measurements.baz", "measurements.qux"],
+            0,
+            None,
+            "",
+            {"project_id": [self.project.id]},
+            "exclude_outliers",
+        )
+        # the fences are 3 + 3 * 2 = 9 for foo and 20 + 3 * 10 = 50 for bar
+        assert values == (0, 50)
+
         # single min/max returned from snuba
         mock_query.side_effect = [
             {
@@ -1595,22 +1720,26 @@ class QueryTransformTest(TestCase):
         mock_query.side_effect = [
             {
                 "meta": [
-                    {"name": "min_measurements_foo"},
-                    {"name": "min_measurements_bar"},
-                    {"name": "min_measurements_baz"},
-                    {"name": "max_measurements_foo"},
-                    {"name": "max_measurements_bar"},
-                    {"name": "max_measurements_baz"},
+                    {"name": "array_join_measurements_key"},
+                    {"name": "min_value_measurements_value"},
+                    {"name": "max_value_measurements_value"},
                 ],
                 "data": [
                     {
-                        "min_measurements_foo": 1.23,
-                        "min_measurements_bar": 1.34,
-                        "min_measurements_baz": 1.45,
-                        "max_measurements_foo": 3.45,
-                        "max_measurements_bar": 3.56,
-                        "max_measurements_baz": 3.67,
-                    }
+                        "array_join_measurements_key": "foo",
+                        "min_value_measurements_value": 1.23,
+                        "max_value_measurements_value": 3.45,
+                    },
+                    {
+                        "array_join_measurements_key": "bar",
+                        "min_value_measurements_value": 1.34,
+                        "max_value_measurements_value": 3.56,
+                    },
+                    {
+                        "array_join_measurements_key": "baz",
+                        "min_value_measurements_value": 1.45,
+                        "max_value_measurements_value": 3.67,
+                    },
                 ],
             },
         ]
@@ -1627,22 +1756,26 @@ class QueryTransformTest(TestCase):
         mock_query.side_effect = [
             {
                 "meta": [
-                    {"name": "min_measurements_foo"},
-                    {"name": "min_measurements_bar"},
-                    {"name": "min_measurements_baz"},
-                    {"name": "max_measurements_foo"},
-                    {"name": "max_measurements_bar"},
-                    {"name": "max_measurements_baz"},
+                    {"name": "array_join_measurements_key"},
+                    {"name": "min_value_measurements_value"},
+                    {"name": "max_value_measurements_value"},
                 ],
                 "data": [
                     {
-                        "min_measurements_foo": 1.23,
-                        "min_measurements_bar": None,
-                        "min_measurements_baz": 1.45,
-                        "max_measurements_foo": 3.45,
-                        "max_measurements_bar": None,
-                        "max_measurements_baz": 3.67,
-                    }
+                        "array_join_measurements_key": "foo",
+                        "min_value_measurements_value": 1.23,
+                        "max_value_measurements_value": 3.45,
+                    },
+                    {
+                        "array_join_measurements_key": "bar",
+                        "min_value_measurements_value": None,
+                        "max_value_measurements_value": None,
+                    },
+                    {
+                        "array_join_measurements_key": "baz",
+                        "min_value_measurements_value": 1.45,
+                        "max_value_measurements_value": 3.67,
+                    },
                 ],
             },
         ]
@@ -1990,14 +2123,22 @@ class QueryTransformTest(TestCase):
     def test_histogram_query(self, mock_query):
         mock_query.side_effect = [
             {
-                "meta": [{"name": "min_measurements_foo"}, {"name": "max_measurements_foo"}],
+                "meta": [
+                    {"name": "array_join_measurements_key"},
+                    {"name": "min_value_measurements_value"},
+                    {"name": "max_value_measurements_value"},
+                ],
                 "data": [
                     {
-                        "min_measurements_bar": 2,
-                        "min_measurements_foo": 0,
-                        "max_measurements_bar": 2,
-                        "max_measurements_foo": 2,
-                    }
+                        "array_join_measurements_key": "bar",
+                        "min_value_measurements_value": 2,
+                        "max_value_measurements_value": 2,
+                    },
+                    {
+                        "array_join_measurements_key": "foo",
+                        "min_value_measurements_value": 0,
+                        "max_value_measurements_value": 2,
+                    },
                 ],
             },
             {
@@ -2382,6 +2523,78 @@ class GetFacetsTest(SnubaTestCase, TestCase):
         assert {r.value for r in result} == {"red", "blue", "1", "0", "error"}
         assert {r.count for r in result} == {1, 2}
 
+    def test_single_project_without_batching(self):
+        self.store_event(
+            data={
+                "message": "very bad",
+                "type": "default",
+                "timestamp": iso_format(before_now(minutes=2)),
+                "tags": {"color": "red", "paying": "1"},
+            },
+            project_id=self.project.id,
+        )
+        self.store_event(
+            data={
+                "message": "very bad",
+                "type": "default",
+                "timestamp": iso_format(before_now(minutes=2)),
+                "tags": {"color": "blue", "paying": "0"},
+            },
+            project_id=self.project.id,
+        )
+        params = {"project_id": [self.project.id], "start": self.day_ago, "end": self.min_ago}
+        with self.options(
+            {"discover2.facets_individual_batch": False, "discover2.max_tags_to_combine": 0}
+        ):
+            result = discover.get_facets("", params)
+        assert len(result) == 5
+        assert {r.key for r in result} == {"color", "paying", "level"}
+        assert {r.value for r in result} == {"red", "blue", "1", "0", "error"}
+        assert {r.count for r in result} == {1, 2}
+
+    def test_missing_tag_with_and_without_batching(self):
+        self.store_event(
+            data={
+                "message": "very bad",
+                "type": "default",
+                "timestamp": iso_format(before_now(minutes=2)),
+                "tags": {"color": "red", "paying": "1"},
+            },
+            project_id=self.project.id,
+        )
+        self.store_event(
+            data={
+                "message": "very bad",
+                "type": "default",
+                "timestamp": iso_format(before_now(minutes=2)),
+                "tags": {"color": "blue"},
+            },
+            project_id=self.project.id,
+        )
+        params = {"project_id": [self.project.id], "start": self.day_ago, "end": self.min_ago}
+        with self.options(
+            {"discover2.facets_individual_batch": False, "discover2.max_tags_to_combine": 0}
+        ):
+            unbatched = {(r.key, r.value): r.count for r in discover.get_facets("", params)}
+        with self.options({"discover2.facets_individual_batch": True}):
+            batched = {(r.key, r.value): r.count for r in discover.get_facets("", params)}
+
+        # Grouping on the tag also counts the event without it, but the batched
+        # query only sees the tags events actually have.
+        missing = [
+            (key, value, count)
+            for (key, value), count in unbatched.items()
+            if (key, value) not in batched
+        ]
+        assert len(missing) == 1
+        key, value, count = missing[0]
+        assert key == "paying"
+        assert not value
+        assert count == 1
+
+        # every other value is counted the same either way
+        assert {k: unbatched[k] for k in batched} == batched
+
     def test_project_filter(self):
         self.store_event(
             data={
@@ -2539,3 +2752,48 @@ def test_zerofill():
 
     assert results[0]["time"] == 1546387200
     assert results[7]["time"] == 1546992000
+
+
+def test_zerofill_with_data():
+    start = datetime(2019, 1, 2, 0, 0)
+    end = datetime(2019, 1, 5, 23, 59, 59)
+    data = [
+        {"time": 1546646400, "count": 3},
+        {"time": 1546473600, "count": 1},
+        {"time": 1546473600, "count": 2},
+        # not aligned with any bucket
+        {"time": 1546473601, "count": 4},
+    ]
+    results = discover.zerofill(data, start, end, 86400, "time")
+    assert results == [
+        {"time": 1546387200},
+        {"time": 1546473600, "count": 1},
+        {"time": 1546473600, "count": 2},
+        {"time": 1546560000},
+        {"time": 1546646400, "count": 3},
+    ]
+
+    results_desc = discover.zerofill(data, start, end, 86400, "-time")
+    assert results_desc == list(reversed(results))
+
+
+def test_transform_data():
+    result = {
+        "meta": [
+            {"name": "tags[foo]", "type": "String"},
+            {"name": "p95", "type": "Float64"},
+            {"name": "count", "type": "UInt64"},
+        ],
+        "data": [
+            {"tags[foo]": "bar", "p95": float("nan"), "count": 1},
+            {"tags[foo]": "baz", "p95": 1.5, "count": 2},
+        ],
+    }
+    translated_columns = {"tags[foo]": "foo", "p95": "p95"}
+    result = discover.transform_data(result, translated_columns, Filter())
+
+    assert [col["name"] for col in result["meta"]] == ["foo", "p95", "count"]
+    assert result["data"] == [
+        {"foo": "bar", "p95": 0, "count": 1},
+        {"foo": "baz", "p95": 1.5, "count": 2},
+    ]